@@ -0,0 +1,346 @@
+"""
+Benchmarks for ChessDisplayable, run headless with the stubs in harness.py
+
+    python bench/bench_displayable.py [--iterations N] [--games N] [--engine fake|stockfish] [--only NAME]
+
+For each benchmark, reports the latency per call in microseconds and, from a separate run
+under tracemalloc so the timings are not slowed down, the memory blocks allocated by a call
+and still alive after it, the peak memory allocated during a call and the redraws and
+interaction restarts requested per call
+
+The checks in CHECKS are run first, the benchmarks only if they pass
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import harness
+
+class Result(object):
+    def __init__(self, name, timings, blocks_per_call, peak_bytes, redraws_per_call, restarts_per_call):
+        self.name = name
+        self.timings = sorted(timings)
+        self.blocks_per_call = blocks_per_call
+        self.peak_bytes = peak_bytes
+        self.redraws_per_call = redraws_per_call
+        self.restarts_per_call = restarts_per_call
+
+    def percentile(self, fraction):
+        return self.timings[min(len(self.timings) - 1, int(len(self.timings) * fraction))]
+
+    def row(self):
+        mean = sum(self.timings) / len(self.timings)
+        return '%-28s %7d %10.1f %10.1f %10.1f %10.1f %9.1f %9.1f %8.2f %8.2f' % (
+            self.name, len(self.timings), mean * 1e6, self.percentile(0.5) * 1e6,
+            self.percentile(0.95) * 1e6, self.timings[-1] * 1e6,
+            self.blocks_per_call, self.peak_bytes / 1024.0, self.redraws_per_call, self.restarts_per_call)
+
+HEADER = '%-28s %7s %10s %10s %10s %10s %9s %9s %8s %8s' % (
+    'benchmark', 'calls', 'mean us', 'p50 us', 'p95 us', 'max us', 'blocks', 'peak KiB', 'redraws', 'restarts')
+
+def measure(calls):
+    """
+    calls: a list of (setup, fn), setup is run before fn untimed and may be None
+    each fn is timed once, then the whole list is run again to count allocations
+    """
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for setup, fn in calls:
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return timings
+
+def run_benchmark(name, make_calls):
+    """
+    make_calls: returns a fresh list of (setup, fn), see measure
+    it's called twice, once for timing and once for counting, so both runs start from the same state
+    """
+    timings = measure(make_calls())
+
+    calls = make_calls()
+    harness.counters.reset()
+    gc.collect()
+    tracemalloc.start()
+    blocks = 0
+    peak_bytes = 0
+    for setup, fn in calls:
+        if setup is not None:
+            setup()
+        # only what fn allocates is traced, so blocks freed by fn that were allocated
+        # before it (e.g. by the setup) don't make the count negative
+        tracemalloc.clear_traces()
+        fn()
+        blocks += len(tracemalloc.take_snapshot().traces)
+        peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    num_calls = float(len(calls))
+    return Result(name, timings, blocks / num_calls, peak_bytes,
+        harness.counters.redraws / num_calls, harness.counters.restarts / num_calls)
+
+# positions
+
+def random_game(chess, seed, max_plies=120):
+    """
+    the moves of a reproducible random game
+    """
+    rng = random.Random(seed)
+    board = chess.Board()
+    moves = []
+    while len(moves) < max_plies and not board.is_game_over():
+        move = rng.choice(list(board.legal_moves))
+        board.push(move)
+        moves.append(move)
+    return moves
+
+def new_pvp(store, moves=()):
+    chess_displayable = store['ChessDisplayable'](player_color=None, depth=None)
+    for move in moves:
+        chess_displayable.make_move(move)
+    return chess_displayable
+
+# benchmarks
+
+def bench_render(store, args):
+    chess = store['chess']
+    chess_displayable = new_pvp(store, random_game(chess, 1, 40))
+    # a selected piece with its legal destinations
+    harness.click(chess_displayable, chess.square_name(
+        next(iter(chess_displayable.board.legal_moves)).from_square))
+    return lambda: [(None, lambda: chess_displayable.render(720, 720, 0, 0))] * args.iterations
+
+def bench_render_flipped(store, args):
+    chess = store['chess']
+    chess_displayable = new_pvp(store, random_game(chess, 1, 40))
+    def flip_and_render():
+        chess_displayable.flip_board()
+        chess_displayable.render(720, 720, 0, 0)
+    return lambda: [(None, flip_and_render)] * args.iterations
+
+def bench_move_animation_frame(store, args):
+    """
+    one frame of a move animation, only the sprite layer is rendered, the layers below keep their renders
+    compare with render, a frame of the whole chess displayable
+    """
+    chess = store['chess']
+    chess_displayable = new_pvp(store, random_game(chess, 1, 40))
+    move_animation = chess_displayable.move_animation
+    move_animation.render(720, 720, 0, 0)
+    move = next(iter(chess_displayable.board.legal_moves))
+    sprites = store['get_move_sprites'](chess_displayable.board, move)
+    frame_time = 1.0 / 60
+    frames = int(store['MOVE_ANIMATION_TIME'] / frame_time)
+    def make_calls():
+        calls = []
+        for idx in range(args.iterations):
+            frame = idx % frames
+            # a new animation every few frames, started outside the measurement
+            setup = (lambda: move_animation.start(*sprites)) if frame == 0 else None
+            calls.append((setup, lambda st=frame * frame_time: move_animation.render(720, 720, st, 0)))
+        return calls
+    return make_calls
+
+def bench_event_hover(store, args):
+    pygame = sys.modules['pygame']
+    chess_displayable = new_pvp(store)
+    board_input = harness.input_layer(chess_displayable)
+    # a random walk of the cursor, like mouse motion events, which mostly stay within a loc
+    rng = random.Random(2)
+    x, y = 360, 360
+    points = []
+    for _ in range(args.iterations):
+        x = min(max(x + rng.randrange(-12, 13), 1), 718)
+        y = min(max(y + rng.randrange(-12, 13), 1), 718)
+        points.append((x, y))
+    def make_calls():
+        calls = []
+        for x, y in points:
+            ev = harness.Event(pygame.MOUSEMOTION, pos=(x, y))
+            calls.append((None, lambda ev=ev, x=x, y=y: board_input.event(ev, x, y, 0)))
+        return calls
+    return make_calls
+
+def bench_event_select(store, args):
+    """
+    clicks selecting and deselecting pieces, i.e. the legal destinations lookup
+    """
+    chess = store['chess']
+    chess_displayable = new_pvp(store, random_game(chess, 3, 30))
+    squares = [chess.square_name(square) for square in chess.SquareSet(
+        chess_displayable.board.occupied_co[chess_displayable.board.turn])]
+    def make_calls():
+        calls = []
+        for idx in range(args.iterations):
+            square = squares[idx % len(squares)]
+            calls.append((None, lambda square=square: harness.click(chess_displayable, square)))
+        return calls
+    return make_calls
+
+def bench_make_move(store, args):
+    chess = store['chess']
+    moves = random_game(chess, 4)
+    def make_calls():
+        chess_displayable = new_pvp(store)
+        return [(None, lambda move=move: chess_displayable.make_move(move)) for move in moves]
+    return make_calls
+
+def bench_undo_move(store, args):
+    chess = store['chess']
+    moves = random_game(chess, 4)
+    def make_calls():
+        chess_displayable = new_pvp(store, moves)
+        return [(None, chess_displayable.undo_move)] * len(moves)
+    return make_calls
+
+def bench_check_game_status(store, args):
+    chess = store['chess']
+    displayables = [new_pvp(store, random_game(chess, seed, 60)) for seed in range(10)]
+    def make_calls():
+        return [(None, displayables[idx % len(displayables)].check_game_status)
+            for idx in range(args.iterations)]
+    return make_calls
+
+def bench_pvp_games(store, args):
+    """
+    full games played by clicks, one call per move
+    """
+    chess = store['chess']
+    games = [random_game(chess, 100 + seed) for seed in range(args.games)]
+    def make_calls():
+        calls = []
+        for moves in games:
+            chess_displayable = [None]
+            def start(chess_displayable=chess_displayable):
+                chess_displayable[0] = new_pvp(store)
+            for idx, move in enumerate(moves):
+                calls.append((start if idx == 0 else None,
+                    lambda move=move, chess_displayable=chess_displayable: harness.click_move(chess_displayable[0], move)))
+        return calls
+    return make_calls
+
+def bench_pvc_turns(store, args):
+    """
+    computer turns, from the player's click to the engine's move being applied by the screen's poll
+    the player plays the first legal move of each position
+    """
+    chess = store['chess']
+    poll_interval = store['ENGINE_POLL_INTERVAL'] / 10.0
+    def make_calls():
+        calls = []
+        for game_idx in range(args.games):
+            chess_displayable = [None]
+            def start(chess_displayable=chess_displayable):
+                chess_displayable[0] = store['ChessDisplayable'](player_color=chess.WHITE, depth=args.depth)
+            def turn(chess_displayable=chess_displayable):
+                d = chess_displayable[0]
+                if d.game_status in [store['CHECKMATE'], store['STALEMATE'], store['DRAW']]:
+                    return
+                harness.click_move(d, min(d.board.legal_moves, key=lambda move: move.uci()))
+                while d.is_engine_turn():
+                    d.poll_engine_turn()
+                    time.sleep(poll_interval)
+            for idx in range(args.plies):
+                calls.append((start if idx == 0 else None, turn))
+        return calls
+    return make_calls
+
+# checks
+
+def play_computer_turn(store, chess_displayable):
+    """
+    the player plays the first legal move in uci order, then the screen's poll waits for the engine's reply
+    """
+    harness.click_move(chess_displayable, min(chess_displayable.board.legal_moves, key=lambda move: move.uci()))
+    while chess_displayable.is_engine_turn():
+        chess_displayable.poll_engine_turn()
+        time.sleep(store['ENGINE_POLL_INTERVAL'] / 10.0)
+
+def check_save_load(store):
+    """
+    a game saved mid-game resumes from the same position when loaded, instead of a fresh board
+    the scope of the chess screen, with the displayables its defaults created, is pickled as in a Ren'Py save,
+    while the engine ponders and the evaluation bar analyses
+    """
+    chess = store['chess']
+    chess_displayable = store['ChessDisplayable'](player_color=chess.WHITE, depth=2, time_control=(300, 3))
+    for _ in range(3):
+        play_computer_turn(store, chess_displayable)
+    chess_displayable.poll_eval_bar()
+    chess_displayable.clock.start()
+    scope = {'chess_displayable': chess_displayable, 'board_input': harness.input_layer(chess_displayable)}
+
+    loaded = harness.save_load(scope)
+    restored = loaded['chess_displayable']
+    assert loaded['board_input'].chess_displayable is restored
+    assert restored.board.move_stack == chess_displayable.board.move_stack
+    assert restored.board.fen() == chess_displayable.board.fen()
+    assert restored.history.sans == chess_displayable.history.sans
+    assert restored.whose_turn == chess_displayable.whose_turn
+    for color in chess.COLORS:
+        assert abs(restored.clock.remaining_time(color) - chess_displayable.clock.remaining_time(color)) < 1.0
+    assert restored.engine_search is None and restored.ponder_search is None
+    chess_displayable.cancel_engine_turn()
+    chess_displayable.stop_eval_bar()
+
+    # the computer plays on after loading
+    plies = len(restored.board.move_stack)
+    play_computer_turn(store, restored)
+    assert len(restored.board.move_stack) == plies + 2
+    restored.cancel_engine_turn()
+
+CHECKS = [
+    ('save_load', check_save_load),
+    ]
+
+BENCHMARKS = [
+    ('render', bench_render),
+    ('render_flipped', bench_render_flipped),
+    ('move_animation_frame', bench_move_animation_frame),
+    ('event_hover', bench_event_hover),
+    ('event_select', bench_event_select),
+    ('make_move', bench_make_move),
+    ('undo_move', bench_undo_move),
+    ('check_game_status', bench_check_game_status),
+    ('pvp_game_click_move', bench_pvp_games),
+    ('pvc_computer_turn', bench_pvc_turns),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000, help='calls per micro benchmark')
+    parser.add_argument('--games', type=int, default=5, help='games per full game benchmark')
+    parser.add_argument('--plies', type=int, default=20, help='player moves per computer game')
+    parser.add_argument('--depth', type=int, default=4, help='difficulty of the computer player')
+    parser.add_argument('--engine', choices=['fake', 'stockfish'], default='fake',
+        help='the stand-in engine in fake_uci.py, or the stockfish binary of this platform')
+    parser.add_argument('--only', action='append', help='run only the named benchmarks')
+    args = parser.parse_args()
+
+    store = harness.load_store(engine_command=harness.FAKE_ENGINE_COMMAND if args.engine == 'fake' else None)
+    try:
+        # computer turns search node budgets once the engine has been calibrated, see chess_engine.rpy
+        harness.wait_for_calibration(store)
+        for name, check in CHECKS:
+            check(store)
+            print('check %s: ok' % name)
+        print(HEADER)
+        for name, bench in BENCHMARKS:
+            if args.only and name not in args.only:
+                continue
+            print(run_benchmark(name, bench(store, args)).row())
+            sys.stdout.flush()
+    finally:
+        store['quit_stockfish']()
+
+if __name__ == '__main__':
+    main()
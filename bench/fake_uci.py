@@ -0,0 +1,194 @@
+"""
+A stand-in UCI engine for the benchmarks, so computer turns can be measured without stockfish
+It searches nothing: it waits as long as a search of the requested depth or nodes would take
+at --nps nodes per second, reporting info lines along the way, then plays a legal move
+Moves are ranked by a cheap material heuristic, so games end in reasonable time and are reproducible
+
+    python fake_uci.py [--nps NODES_PER_SECOND]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(BENCH_DIR), 'game', '00-chess-engine', 'python-packages'))
+
+import chess
+
+# nodes needed to complete each depth grow by this factor
+BRANCHING_FACTOR = 2.5
+NODES_AT_DEPTH_1 = 30
+MAX_DEPTH = 30
+# how often an ongoing search checks for stop and reports progress, in seconds
+TICK = 0.005
+
+PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300, chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
+
+def nodes_at_depth(depth):
+    return int(NODES_AT_DEPTH_1 * BRANCHING_FACTOR ** (depth - 1))
+
+def rank_moves(board):
+    """
+    the legal moves with their scores in centipawns, best first
+    captures of the most valuable piece and promotions first, then checks, then by uci for determinism
+    """
+    scored_moves = []
+    for move in board.legal_moves:
+        score = 0
+        captured = board.piece_type_at(move.to_square)
+        if captured:
+            score += PIECE_VALUES[captured]
+        if move.promotion:
+            score += PIECE_VALUES[move.promotion]
+        if board.gives_check(move):
+            score += 50
+        scored_moves.append((-score, move.uci(), move))
+    scored_moves.sort()
+    return [(move, -neg_score) for neg_score, uci, move in scored_moves]
+
+class FakeEngine(object):
+    def __init__(self, nps):
+        self.nps = nps
+        self.board = chess.Board()
+        self.multipv = 1
+        self.search_thread = None
+        self.stop_event = threading.Event()
+        self.output_lock = threading.Lock()
+
+    def send(self, line):
+        with self.output_lock:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+
+    def run(self):
+        for line in sys.stdin:
+            tokens = line.split()
+            if not tokens:
+                continue
+            command = tokens[0]
+            if command == 'uci':
+                self.send('id name FakeUCI')
+                self.send('id author renpy-chess benchmarks')
+                self.send('option name MultiPV type spin default 1 min 1 max 500')
+                self.send('option name Threads type spin default 1 min 1 max 512')
+                self.send('option name Hash type spin default 16 min 1 max 33554432')
+                self.send('option name Ponder type check default false')
+                self.send('uciok')
+            elif command == 'isready':
+                self.send('readyok')
+            elif command == 'setoption':
+                self.set_option(tokens)
+            elif command == 'ucinewgame':
+                self.stop_search()
+            elif command == 'position':
+                self.stop_search()
+                self.set_position(tokens)
+            elif command == 'go':
+                self.stop_search()
+                self.start_search(tokens)
+            elif command == 'stop':
+                self.stop_search()
+            elif command == 'ponderhit':
+                pass
+            elif command == 'quit':
+                self.stop_search()
+                return
+
+    def set_option(self, tokens):
+        if 'name' in tokens and 'value' in tokens:
+            name = ' '.join(tokens[tokens.index('name') + 1:tokens.index('value')])
+            value = ' '.join(tokens[tokens.index('value') + 1:])
+            if name.lower() == 'multipv':
+                self.multipv = max(1, int(value))
+
+    def set_position(self, tokens):
+        if 'moves' in tokens:
+            moves = tokens[tokens.index('moves') + 1:]
+            tokens = tokens[:tokens.index('moves')]
+        else:
+            moves = []
+        if tokens[1] == 'startpos':
+            self.board = chess.Board()
+        else:
+            self.board = chess.Board(' '.join(tokens[2:]))
+        for uci in moves:
+            self.board.push_uci(uci)
+
+    def start_search(self, tokens):
+        params = {}
+        for name in ['depth', 'nodes', 'movetime']:
+            if name in tokens:
+                params[name] = int(tokens[tokens.index(name) + 1])
+        infinite = 'infinite' in tokens or 'ponder' in tokens
+        self.stop_event.clear()
+        self.search_thread = threading.Thread(target=self.search,
+            args=(self.board.copy(), params, infinite))
+        self.search_thread.daemon = True
+        self.search_thread.start()
+
+    def stop_search(self):
+        if self.search_thread is not None:
+            self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+    def search(self, board, params, infinite):
+        ranked_moves = rank_moves(board)
+        max_depth = params.get('depth', MAX_DEPTH)
+        max_nodes = params.get('nodes')
+        deadline = time.time() + params['movetime'] / 1000.0 if 'movetime' in params else None
+        start = time.time()
+
+        depth = 0
+        nodes = 0
+        while ranked_moves and depth < max_depth:
+            target_nodes = nodes_at_depth(depth + 1)
+            if max_nodes is not None:
+                target_nodes = min(target_nodes, max_nodes)
+            # wait as long as searching the nodes of the next depth would take
+            finish = start + target_nodes / float(self.nps)
+            while time.time() < finish:
+                if self.stop_event.is_set() or (deadline is not None and time.time() >= deadline):
+                    break
+                time.sleep(min(TICK, max(0.0, finish - time.time())))
+            else:
+                depth += 1
+                nodes = target_nodes
+                self.report(ranked_moves, depth, nodes, time.time() - start)
+                if max_nodes is not None and nodes >= max_nodes:
+                    break
+                continue
+            break
+
+        # an infinite search only ends with stop
+        while infinite and not self.stop_event.is_set():
+            time.sleep(TICK)
+
+        if not ranked_moves:
+            self.send('bestmove (none)')
+            return
+        best_move = ranked_moves[0][0]
+        board.push(best_move)
+        replies = rank_moves(board)
+        if replies:
+            self.send('bestmove %s ponder %s' % (best_move.uci(), replies[0][0].uci()))
+        else:
+            self.send('bestmove %s' % best_move.uci())
+
+    def report(self, ranked_moves, depth, nodes, elapsed):
+        time_ms = max(1, int(elapsed * 1000))
+        for idx, (move, score) in enumerate(ranked_moves[:self.multipv]):
+            self.send('info depth %d seldepth %d multipv %d score cp %d nodes %d nps %d time %d pv %s' % (
+                depth, depth, idx + 1, score, nodes, nodes * 1000 // time_ms, time_ms, move.uci()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nps', type=int, default=1000000, help='simulated nodes per second')
+    args = parser.parse_args()
+    FakeEngine(args.nps).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+"""
+Headless harness for the chess displayable
+Runs the init code of the .rpy files against stubs of the renpy and pygame APIs they use,
+so ChessDisplayable can be driven and measured without a running Ren'Py session
+
+    import harness
+    store = harness.load_store(engine_command=harness.FAKE_ENGINE_COMMAND)
+    chess_displayable = store['ChessDisplayable'](player_color=store['chess'].WHITE, depth=4)
+    harness.click(chess_displayable, 'e2') # through the input layer the screen adds on top
+
+Only define, default and init python statements are run, screens and labels are skipped
+The screen's timers are not run either, call poll_engine_turn, poll_hint and poll_eval_bar instead
+As in Ren'Py, the store is the namespace of the module named store, so save_load can pickle its objects
+"""
+
+import os
+import pickle
+import re
+import sys
+import textwrap
+import threading
+import time
+import types
+import random
+import weakref
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'game')
+# files with the init code of the chess engine, in the order Ren'Py runs them
+RPY_FILES = ('00-chess-engine/chess_displayable.rpy', '00-chess-engine/chess_engine.rpy')
+
+# the stand-in uci engine, see fake_uci.py
+FAKE_ENGINE_COMMAND = [sys.executable, os.path.join(BENCH_DIR, 'fake_uci.py')]
+
+# stubs
+
+class Displayable(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def render(self, width, height, st, at):
+        return Render(width, height)
+
+    def event(self, ev, x, y, st):
+        return None
+
+    def visit(self):
+        return []
+
+class Canvas(object):
+    """
+    records the shapes drawn on a render
+    """
+    def __init__(self, render):
+        self.render = render
+
+    def __getattr__(self, name):
+        def draw(*args, **kwargs):
+            self.render.children.append(('canvas.' + name, args))
+        return draw
+
+class Render(object):
+    """
+    records what is placed or blitted, so a benchmark can count the children of a render
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.children = []
+
+    def place(self, d, x=0, y=0, width=None, height=None, **kwargs):
+        self.children.append((d, x, y))
+
+    def blit(self, source, pos, **kwargs):
+        self.children.append((source, pos[0], pos[1]))
+
+    subpixel_blit = blit
+
+    def canvas(self):
+        return Canvas(self)
+
+    def get_size(self):
+        return (self.width, self.height)
+
+    def kill(self):
+        pass
+
+class Stub(object):
+    """
+    stands in for displayables and screen actions, which the displayable only creates and passes around
+    """
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, *args, **kwargs):
+        return None
+
+    def render(self, width, height, st, at):
+        return Render(0, 0)
+
+    def __repr__(self):
+        return '%s%r' % (type(self).__name__, self.args)
+
+class Persistent(object):
+    # like Ren'Py's persistent, fields that have never been set are None
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return None
+
+class Counters(object):
+    """
+    counts the calls the displayable makes into renpy, reset by the benchmarks around each measurement
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.redraws = 0
+        self.restarts = 0
+        self.notifications = []
+
+counters = Counters()
+
+class Event(object):
+    """
+    a pygame event
+    """
+    def __init__(self, type, **kwargs):
+        self.type = type
+        self.__dict__.update(kwargs)
+
+def render_child(d, width, height, st, at):
+    return d.render(width, height, st, at)
+
+def redraw(d, when):
+    counters.redraws += 1
+
+def restart_interaction():
+    counters.restarts += 1
+
+def notify(message):
+    counters.notifications.append(message)
+
+def invoke_in_thread(fn, *args, **kwargs):
+    thread = threading.Thread(target=fn, args=args, kwargs=kwargs)
+    thread.daemon = True
+    thread.start()
+
+def make_renpy():
+    renpy = types.ModuleType('renpy')
+    renpy.Displayable = Displayable
+    renpy.Render = Render
+    renpy.render = render_child
+    renpy.redraw = redraw
+    renpy.restart_interaction = restart_interaction
+    renpy.notify = notify
+    renpy.invoke_in_thread = invoke_in_thread
+    renpy.sound = types.SimpleNamespace(play=lambda *args, **kwargs: None)
+    renpy.show_screen = lambda *args, **kwargs: None
+    renpy.hide_screen = lambda *args, **kwargs: None
+    renpy.retain_after_load = lambda: None
+    renpy.cache_pin = lambda *args: None
+    renpy.random = random.Random(0)
+    renpy.config = types.SimpleNamespace(gamedir=GAME_DIR, savedir=None)
+    # the platform decides which stockfish binary is used, the benchmarks may replace it with engine_command
+    renpy.android = renpy.ios = False
+    renpy.linux = sys.platform.startswith('linux')
+    renpy.macintosh = sys.platform == 'darwin'
+    renpy.windows = sys.platform == 'win32'
+    return renpy
+
+def make_pygame():
+    pygame = types.ModuleType('pygame')
+    for idx, name in enumerate(['MOUSEMOTION', 'MOUSEBUTTONDOWN', 'MOUSEBUTTONUP', 'KEYDOWN', 'KEYUP',
+        'ACTIVEEVENT', 'WINDOWEVENT']):
+        setattr(pygame, name, idx + 1)
+    for idx, name in enumerate(['K_p', 'K_c', 'K_d', 'K_h', 'K_F3']):
+        setattr(pygame, name, idx + 1)
+    pygame.APPMOUSEFOCUS = 1
+    pygame.APPINPUTFOCUS = 2
+    pygame.APPACTIVE = 4
+    pygame.pressed_keys = set()
+    pygame.key = types.SimpleNamespace(get_pressed=lambda: KeyState(pygame.pressed_keys))
+    return pygame
+
+class KeyState(object):
+    def __init__(self, pressed_keys):
+        self.pressed_keys = pressed_keys
+
+    def __getitem__(self, key):
+        return key in self.pressed_keys
+
+def make_store(renpy):
+    # classes defined by the init code are pickled by reference to the store module, as in a Ren'Py save
+    store_module = types.ModuleType('store')
+    sys.modules['store'] = store_module
+    store = store_module.__dict__
+    store['renpy'] = renpy
+    store['config'] = types.SimpleNamespace(developer=False, quit_action=None, gamedir=GAME_DIR)
+    store['build'] = types.SimpleNamespace(executable=lambda path: None, classify=lambda *args: None)
+    store['persistent'] = Persistent()
+    for name in ['Character', 'Confirm', 'Quit', 'NullAction', 'Function', 'Play', 'Hide', 'Return',
+        'SetField', 'ToggleField', 'Show', 'Solid', 'Image', 'Text', 'Transform', 'BarValue', 'DictEquality']:
+        store[name] = type(name, (Stub,), {})
+    store['Color'] = lambda color: color
+    return store
+
+# loading
+
+def parse_rpy(path):
+    """
+    returns (init priority, line number, python code) for the define, default
+    and init python statements of a .rpy file
+    """
+    with open(path, encoding='utf-8-sig') as rpy_file:
+        lines = rpy_file.read().split('\n')
+    statements = []
+    idx = 0
+    while idx < len(lines):
+        define = re.match(r'^(?:define|default) ([\w.]+) = (.*)$', lines[idx])
+        init_python = re.match(r'^init(?: (-?\d+))? python:', lines[idx])
+        if define:
+            # an expression may continue over the next lines until its brackets are closed
+            expr = define.group(2)
+            end = idx + 1
+            while sum(expr.count(c) for c in '([{') > sum(expr.count(c) for c in ')]}'):
+                expr += '\n' + lines[end]
+                end += 1
+            statements.append((0, idx, '%s = %s' % (define.group(1), expr)))
+            idx = end
+        elif init_python:
+            end = idx + 1
+            while end < len(lines) and (not lines[end].strip() or lines[end][0] in ' \t'):
+                end += 1
+            code = textwrap.dedent('\n'.join(lines[idx + 1:end]))
+            statements.append((int(init_python.group(1) or 0), idx + 1, code))
+            idx = end
+        else:
+            idx += 1
+    return statements
+
+def load_store(engine_command=None, rpy_files=RPY_FILES):
+    """
+    run the init code of rpy_files and return the store, i.e. the namespace of the init code
+    engine_command: replaces the stockfish binary, e.g. FAKE_ENGINE_COMMAND
+    the engine processes are started as in the game, call quit_stockfish when done
+    """
+    renpy = make_renpy()
+    sys.modules['renpy'] = renpy
+    sys.modules['pygame'] = make_pygame()
+    store = make_store(renpy)
+
+    statements = []
+    for file_idx, rpy_file in enumerate(rpy_files):
+        path = os.path.join(GAME_DIR, rpy_file)
+        for priority, line_number, code in parse_rpy(path):
+            statements.append((priority, file_idx, line_number, path, code))
+    statements.sort(key=lambda statement: statement[:3])
+
+    engine_replaced = False
+    for priority, file_idx, line_number, path, code in statements:
+        # the engine processes are started at init 1, after the binary has been picked at init 0
+        if priority > 0 and engine_command is not None and not engine_replaced:
+            store['STOCKFISH'] = engine_command
+            store['stockfish_bin'] = os.path.basename(engine_command[-1])
+            engine_replaced = True
+        exec(compile('\n' * line_number + code, path, 'exec'), store)
+    return store
+
+# the pickle protocol of Ren'Py saves
+SAVE_PROTOCOL = 2
+
+def save_load(obj):
+    """
+    returns a copy of obj as it would be after saving and loading a game
+    """
+    return pickle.loads(pickle.dumps(obj, SAVE_PROTOCOL))
+
+def wait_for_calibration(store, timeout=60.0):
+    """
+    wait for the engine calibration started at init, returns False if it didn't finish in time
+    """
+    deadline = time.time() + timeout
+    while not store['is_engine_calibrated']():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.1)
+    return True
+
+# input
+
+def square_center(chess_displayable, square_name):
+    """
+    the screen coord of the center of a square, in the current board orientation
+    """
+    chess = sys.modules['chess']
+    square = chess.parse_square(square_name)
+    loc_len = chess_displayable_store(chess_displayable)['LOC_LEN']
+    file_idx, rank_idx = chess.square_file(square), chess.square_rank(square)
+    if chess_displayable.bottom_color == chess.BLACK:
+        file_idx, rank_idx = 7 - file_idx, 7 - rank_idx
+    return file_idx * loc_len + loc_len // 2, (7 - rank_idx) * loc_len + loc_len // 2
+
+def chess_displayable_store(chess_displayable):
+    return type(chess_displayable).render.__globals__
+
+# chess displayable -> its input layer, which the screen adds on top of it
+input_layers = weakref.WeakKeyDictionary()
+
+def input_layer(chess_displayable):
+    if chess_displayable not in input_layers:
+        store = chess_displayable_store(chess_displayable)
+        input_layers[chess_displayable] = store['BoardInputDisplayable'](chess_displayable)
+    return input_layers[chess_displayable]
+
+def click(chess_displayable, square_name, button=1):
+    pygame = sys.modules['pygame']
+    x, y = square_center(chess_displayable, square_name)
+    return input_layer(chess_displayable).event(Event(pygame.MOUSEBUTTONDOWN, button=button, pos=(x, y)), x, y, 0)
+
+def press_key(chess_displayable, key):
+    pygame = sys.modules['pygame']
+    return input_layer(chess_displayable).event(Event(pygame.KEYDOWN, key=key), 0, 0, 0)
+
+def hover(chess_displayable, x, y):
+    pygame = sys.modules['pygame']
+    return input_layer(chess_displayable).event(Event(pygame.MOUSEMOTION, pos=(x, y)), x, y, 0)
+
+def click_move(chess_displayable, move):
+    """
+    play move by clicking its squares, choosing the promotion piece first if any
+    """
+    chess = sys.modules['chess']
+    click(chess_displayable, chess.square_name(move.from_square))
+    if move.promotion:
+        chess_displayable.promotion = move.promotion
+    click(chess_displayable, chess.square_name(move.to_square))
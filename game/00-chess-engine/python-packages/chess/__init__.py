@@ -38,7 +38,7 @@ import re
 import itertools
 import typing
 
-from typing import ClassVar, Callable, Counter, Dict, Generic, Hashable, Iterable, Iterator, List, Mapping, Optional, SupportsInt, Tuple, Type, TypeVar, Union
+from typing import ClassVar, Callable, Counter, Dict, FrozenSet, Generic, Hashable, Iterable, Iterator, List, Mapping, Optional, SupportsInt, Tuple, Type, TypeVar, Union
 
 try:
     from typing import Literal
@@ -165,6 +165,49 @@ class Outcome:
         return "1/2-1/2" if self.winner is None else ("1-0" if self.winner else "0-1")
 
 
+@dataclasses.dataclass
+class PositionStatus:
+    """
+    Check, game end and draw claim conditions of a position, usually obtained
+    from :func:`chess.Board.position_status()`.
+    """
+
+    is_check: bool
+    """See :func:`chess.Board.is_check()`."""
+
+    is_checkmate: bool
+    """See :func:`chess.Board.is_checkmate()`."""
+
+    is_stalemate: bool
+    """See :func:`chess.Board.is_stalemate()`."""
+
+    is_insufficient_material: bool
+    """See :func:`chess.Board.is_insufficient_material()`."""
+
+    is_seventyfive_moves: bool
+    """See :func:`chess.Board.is_seventyfive_moves()`."""
+
+    is_fivefold_repetition: bool
+    """See :func:`chess.Board.is_fivefold_repetition()`."""
+
+    can_claim_fifty_moves: bool
+    """See :func:`chess.Board.can_claim_fifty_moves()`."""
+
+    can_claim_threefold_repetition: bool
+    """See :func:`chess.Board.can_claim_threefold_repetition()`."""
+
+    def is_automatic_draw(self) -> bool:
+        """
+        Checks if the game is drawn by insufficient material, the
+        seventyfive-move rule or fivefold repetition.
+        """
+        return self.is_insufficient_material or self.is_seventyfive_moves or self.is_fivefold_repetition
+
+    def can_claim_draw(self) -> bool:
+        """See :func:`chess.Board.can_claim_draw()`."""
+        return self.can_claim_fifty_moves or self.can_claim_threefold_repetition
+
+
 class InvalidMoveError(ValueError):
     """Raised when move notation is not syntactically valid"""
 
@@ -603,6 +646,29 @@ class Move:
         """
         return cls(0, 0)
 
+    def pack(self) -> int:
+        """
+        Packs the move into a 16-bit integer: the source square in bits 0-5,
+        the target square in bits 6-11, the promotion or drop piece type in
+        bits 12-14 and a drop flag in bit 15.
+
+        >>> import chess
+        >>>
+        >>> chess.Move.from_uci("a7a8q").pack()
+        24112
+        >>> chess.Move.from_packed(24112)
+        Move.from_uci('a7a8q')
+        """
+        return self.from_square | self.to_square << 6 | (self.drop or self.promotion or 0) << 12 | (1 << 15 if self.drop else 0)
+
+    @classmethod
+    def from_packed(cls, packed: int) -> Move:
+        """Unpacks a move packed with :func:`~chess.Move.pack()`."""
+        piece_type = (packed >> 12) & 7 or None
+        if packed & (1 << 15):
+            return cls(packed & 63, (packed >> 6) & 63, drop=piece_type)
+        return cls(packed & 63, (packed >> 6) & 63, promotion=piece_type)
+
 
 BaseBoardT = TypeVar("BaseBoardT", bound="BaseBoard")
 
@@ -1565,6 +1631,7 @@ class Board(BaseBoard):
         self.ep_square = None
         self.move_stack = []
         self._stack: List[_BoardState[BoardT]] = []
+        self._legal_destinations: Optional[LegalDestinations] = None
 
         if fen is None:
             self.clear()
@@ -1648,6 +1715,7 @@ class Board(BaseBoard):
         """Clears the move stack."""
         self.move_stack.clear()
         self._stack.clear()
+        self._legal_destinations = None
 
     def root(self: BoardT) -> BoardT:
         """Returns a copy of the root position."""
@@ -2167,6 +2235,83 @@ class Board(BaseBoard):
 
         return False
 
+    def position_status(self) -> PositionStatus:
+        """
+        Checks for check, checkmate, stalemate, insufficient material, the
+        fifty-move and seventyfive-move rules and threefold and fivefold
+        repetition all at once.
+
+        Gives the same results as calling the individual methods, but legal
+        moves are generated only once, and repetitions are counted from the
+        stored board states instead of replaying the move stack. The cost is
+        bounded by the half-move clock, not by the length of the game.
+
+        The legal moves are also used to fill the cache of
+        :func:`~chess.Board.legal_destinations()`.
+        """
+        legal_moves = list(self.generate_legal_moves())
+        if not self._has_legal_destinations():
+            self._legal_destinations = LegalDestinations(self, legal_moves)
+
+        is_check = self.is_check()
+        has_legal_moves = bool(legal_moves)
+
+        # Count positions since the last zeroing move. Earlier positions
+        # differ in pawns or material and can not repeat.
+        transposition_key = self._transposition_key()
+        transpositions: Counter[Hashable] = collections.Counter()
+        transpositions.update((transposition_key, ))
+        replies: Counter[Hashable] = collections.Counter()
+        num_reversible = min(self.halfmove_clock, len(self._stack))
+        if num_reversible:
+            board = type(self)(None, chess960=self.chess960)
+            for state in itertools.islice(reversed(self._stack), num_reversible):
+                state.restore(board)
+                key = board._transposition_key()
+                transpositions.update((key, ))
+                if state.turn != self.turn:
+                    replies.update((key, ))
+
+        # The next legal move is a threefold repetition. Only positions with
+        # the opponent to move that already occurred twice are candidates.
+        can_claim_threefold_repetition = transpositions[transposition_key] >= 3
+        if not can_claim_threefold_repetition and any(count >= 2 for count in replies.values()):
+            for move in legal_moves:
+                if self.is_zeroing(move):
+                    continue
+                self.push(move)
+                try:
+                    if replies[self._transposition_key()] >= 2:
+                        can_claim_threefold_repetition = True
+                        break
+                finally:
+                    self.pop()
+
+        # Like can_claim_fifty_moves(), a move reaching the hundredth half-move
+        # only counts if the opponent still has a legal reply.
+        can_claim_fifty_moves = self.halfmove_clock >= 100 and has_legal_moves
+        if not can_claim_fifty_moves and self.halfmove_clock >= 99:
+            for move in legal_moves:
+                if self.is_zeroing(move):
+                    continue
+                self.push(move)
+                try:
+                    if any(self.generate_legal_moves()):
+                        can_claim_fifty_moves = True
+                        break
+                finally:
+                    self.pop()
+
+        return PositionStatus(
+            is_check=is_check,
+            is_checkmate=is_check and not has_legal_moves,
+            is_stalemate=not is_check and not has_legal_moves and not self.is_variant_end(),
+            is_insufficient_material=self.is_insufficient_material(),
+            is_seventyfive_moves=self.halfmove_clock >= 150 and has_legal_moves,
+            is_fivefold_repetition=transpositions[transposition_key] >= 5,
+            can_claim_fifty_moves=can_claim_fifty_moves,
+            can_claim_threefold_repetition=can_claim_threefold_repetition)
+
     def _board_state(self: BoardT) -> _BoardState[BoardT]:
         return _BoardState(self)
 
@@ -2199,6 +2344,7 @@ class Board(BaseBoard):
         # Push move and remember board state.
         move = self._to_chess960(move)
         board_state = self._board_state()
+        self._legal_destinations = None
         self.castling_rights = self.clean_castling_rights()  # Before pushing stack
         self.move_stack.append(self._from_chess960(self.chess960, move.from_square, move.to_square, move.promotion, move.drop))
         self._stack.append(board_state)
@@ -2302,6 +2448,7 @@ class Board(BaseBoard):
         """
         move = self.move_stack.pop()
         self._stack.pop().restore(self)
+        self._legal_destinations = None
         return move
 
     def peek(self) -> Move:
@@ -3551,6 +3698,49 @@ class Board(BaseBoard):
                 if last_double == checker:
                     yield from self.generate_pseudo_legal_ep(from_mask, to_mask)
 
+    def legal_destinations(self) -> LegalDestinations:
+        """
+        Gets an index of the legal destination squares of each piece that can
+        move in the current position.
+
+        The index is computed on first use and cached until the position is
+        changed, whether by :func:`~chess.Board.push()`,
+        :func:`~chess.Board.pop()`, by setting up a new position, or by
+        assigning directly to attributes like :data:`~chess.Board.turn`,
+        :data:`~chess.Board.castling_rights` or
+        :data:`~chess.Board.ep_square`.
+
+        >>> import chess
+        >>>
+        >>> board = chess.Board()
+        >>> destinations = board.legal_destinations()
+        >>> print(chess.SquareSet(destinations.to_mask(chess.G1)))
+        . . . . . . . .
+        . . . . . . . .
+        . . . . . . . .
+        . . . . . . . .
+        . . . . . . . .
+        . . . . . 1 . 1
+        . . . . . . . .
+        . . . . . . . .
+        >>> chess.Move.from_uci("g1f3") in destinations
+        True
+        """
+        if not self._has_legal_destinations():
+            self._legal_destinations = LegalDestinations(self)
+        return self._legal_destinations
+
+    def _has_legal_destinations(self) -> bool:
+        # push() and pop() drop the cache, but the position can also be
+        # edited through plain attributes, so check that it still matches.
+        return self._legal_destinations is not None and self._legal_destinations.key == self._legal_destinations_key()
+
+    def _legal_destinations_key(self) -> Hashable:
+        return (self.pawns, self.knights, self.bishops, self.rooks,
+                self.queens, self.kings,
+                self.occupied_co[WHITE], self.occupied_co[BLACK],
+                self.turn, self.castling_rights, self.ep_square, self.chess960)
+
     def generate_legal_moves(self, from_mask: Bitboard = BB_ALL, to_mask: Bitboard = BB_ALL) -> Iterator[Move]:
         if self.is_variant_end():
             return
@@ -3731,6 +3921,40 @@ class Board(BaseBoard):
 
         return board
 
+    def pack_moves(self) -> bytes:
+        """
+        Packs the move stack into 2 bytes per move, see
+        :func:`~chess.Move.pack()`.
+        """
+        packed = bytearray()
+        for move in self.move_stack:
+            packed += move.pack().to_bytes(2, "little")
+        return bytes(packed)
+
+    @classmethod
+    def from_packed(cls: Type[BoardT], root_fen: str, packed_moves: bytes, chess960: bool = False) -> BoardT:
+        """
+        Creates a board from the FEN of its root position and a move stack
+        packed with :func:`~chess.Board.pack_moves()`, replaying the moves.
+
+        >>> import chess
+        >>>
+        >>> board = chess.Board()
+        >>> board.push_san("e4")
+        Move.from_uci('e2e4')
+        >>> chess.Board.from_packed(board.root().fen(), board.pack_moves()) == board
+        True
+        """
+        board = cls(root_fen, chess960=chess960)
+        for i in range(0, len(packed_moves), 2):
+            board.push(Move.from_packed(int.from_bytes(packed_moves[i:i + 2], "little")))
+        return board
+
+    def __reduce__(self) -> Tuple[Callable[[str, bytes, bool], BoardT], Tuple[str, bytes, bool]]:
+        # Pickles the root position and the packed move stack instead of
+        # the board states, i.e. 2 bytes per move.
+        return type(self).from_packed, (self.root().fen(en_passant="fen"), self.pack_moves(), self.chess960)
+
     @classmethod
     def empty(cls: Type[BoardT], *, chess960: bool = False) -> BoardT:
         """Creates a new empty board. Also see :func:`~chess.Board.clear()`."""
@@ -3808,6 +4032,78 @@ class LegalMoveGenerator:
         return f"<LegalMoveGenerator at {id(self):#x} ({sans})>"
 
 
+class LegalDestinations:
+    """
+    Legal destination squares of a position, indexed by origin square.
+    Returned by :func:`chess.Board.legal_destinations()`.
+
+    Castling moves are indexed like in
+    :func:`~chess.Board.generate_legal_moves()`, i.e., as king moves by two
+    steps, except in Chess960. Drops are not included.
+    """
+
+    destinations: Dict[Square, Bitboard]
+    """A bitboard of legal destination squares for each origin square."""
+
+    promotions: Bitboard
+    """The origin squares of pawns whose legal moves are all promotions."""
+
+    promotion_piece_types: FrozenSet[PieceType]
+    """The piece types that can be promoted to in this position."""
+
+    key: Hashable
+    """The position the index was computed for."""
+
+    def __init__(self, board: Board, legal_moves: Optional[Iterable[Move]] = None) -> None:
+        self.key = board._legal_destinations_key()
+        self.destinations = {}
+        self.promotions = BB_EMPTY
+        promotion_piece_types = set()
+
+        if legal_moves is None:
+            legal_moves = board.generate_legal_moves()
+
+        for move in legal_moves:
+            if move.drop:
+                continue
+            self.destinations[move.from_square] = self.destinations.get(move.from_square, BB_EMPTY) | BB_SQUARES[move.to_square]
+            if move.promotion:
+                self.promotions |= BB_SQUARES[move.from_square]
+                promotion_piece_types.add(move.promotion)
+
+        self.promotion_piece_types = frozenset(promotion_piece_types)
+
+    def from_mask(self) -> Bitboard:
+        """Gets a bitboard of the origin squares with at least one legal move."""
+        mask = BB_EMPTY
+        for from_square in self.destinations:
+            mask |= BB_SQUARES[from_square]
+        return mask
+
+    def to_mask(self, from_square: Square) -> Bitboard:
+        """Gets a bitboard of the legal destination squares from *from_square*."""
+        return self.destinations.get(from_square, BB_EMPTY)
+
+    def is_promotion(self, from_square: Square) -> bool:
+        """Checks if the legal moves from *from_square* are promotions."""
+        return bool(self.promotions & BB_SQUARES[from_square])
+
+    def __bool__(self) -> bool:
+        return bool(self.destinations)
+
+    def __contains__(self, move: Move) -> bool:
+        if not move or move.drop:
+            return False
+        if not self.to_mask(move.from_square) & BB_SQUARES[move.to_square]:
+            return False
+        if self.is_promotion(move.from_square):
+            return move.promotion in self.promotion_piece_types
+        return move.promotion is None
+
+    def __repr__(self) -> str:
+        return f"<LegalDestinations at {id(self):#x} ({', '.join(SQUARE_NAMES[square] for square in self.destinations)})>"
+
+
 IntoSquareSet = Union[SupportsInt, Iterable[Square]]
 
 class SquareSet: